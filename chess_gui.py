@@ -1,3 +1,4 @@
+import threading
 import pygame as pg
 import pygame_gui as gui
 from piece_model import *
@@ -9,24 +10,32 @@ class GUI:
     Attributes:
         _game (Game): Game object holding logic of chess game.
         _screen (Display): Display for the chess game
-        _pieces (image): hold image of all the pieces.
         _ui_manager (gui.UIManager): houses reset, undo, and text
         _side_box (elements): An element to be a text widget
         _undo_button (elements): Element to be a button for user to undo last performed move.
         _restart_button (elements): Element to be the button for user to restart the chess game.
         _piece_selected (bool): Boolean representing if piece has been selected.
-        _first_selected (tuple[int, int]): Tuple representing the location on the board of the
-             piece that's been selected.
-        _valid_moves (list[tuple[int, int]]): A list of tuples representing all the valid moves for this piece.
+        _first_selected (int): The square of the piece that's been selected, packed as y * 8 + x.
+        _valid_moves (int): The bitboard of the squares the selected piece can move to, bit y * 8 + x set for each.
+        _square_rects (list[pg.Rect]): The rectangle covering each square of the board, indexed y * 8 + x.
+        _square_colors (list[tuple[int, int, int]]): The color of each square of the board, indexed y * 8 + x.
+        _board_surface (pg.Surface): Cached drawing of the board squares, its border, and the pieces on them.
+        _board_dirty (bool): Boolean representing if _board_surface needs to be redrawn before the next frame.
+        _ui_elements (tuple[elements]): The UI elements drawn by _ui_manager, the only parts of the screen
+            besides the board that get redrawn.
+        _running (bool): Boolean representing if the game loop should keep running.
+        _ai_thinking (bool): Boolean representing if the computer is working out its move on another thread.
+        _ai_event_type (int): The event type posted once the computer has made its move.
+        _handlers (dict[int, Callable]): Maps each event type the game reacts to onto the method handling it.
     """
     def __init__(self) -> None:
         """Initializes the GUI instance with its components and correct initialization data.
         """
         pg.init()
-        self._game = Game()
         self._screen = pg.display.set_mode((1440, 900))
         pg.display.set_caption("Chess!!!")
-        self._pieces = pg.image.load("./images/pieces.png")
+        # The game is created after the display so its pieces can be converted to the display's pixel format.
+        self._game = Game()
         self._ui_manager = gui.UIManager((1440, 900))
         self._side_box = gui.elements.UITextBox('<b>Chess!!!</b><br /><br />White moves first.<br />', relative_rect=pg.Rect((1000, 100), (400, 500)),
                                  manager=self._ui_manager)
@@ -35,82 +44,167 @@ class GUI:
         self._restart_button = gui.elements.UIButton(relative_rect = pg.Rect((1200, 50), (100, 50)), text='Reset',
                                      manager=self._ui_manager)
         self._piece_selected = False
-        self._first_selected = (0, 0)
-        self._valid_moves = []
+        self._first_selected = 0
+        self._valid_moves = 0
+        self._square_rects = [pg.Rect(x * 105, y * 105, 105, 105) for y in range(0, 8) for x in range(0, 8)]
+        self._square_colors = [(255, 255, 255) if (y + x) & 1 == 0 else (127, 127, 127)
+                               for y in range(0, 8) for x in range(0, 8)]
+        # One pixel larger than the squares so the border lines along the bottom and right fit on it too.
+        self._board_surface = pg.Surface((841, 841)).convert()
+        self._board_dirty = True
+        self._ui_elements = (self._side_box, self._undo_button, self._restart_button)
+        self._running = False
+        self._ai_thinking = False
+        self._ai_event_type = pg.event.custom_type()
+        self._handlers = {pg.QUIT: self._on_quit, pg.MOUSEBUTTONDOWN: self._on_click,
+                          gui.UI_BUTTON_PRESSED: self._on_button, self._ai_event_type: self._on_ai_move}
 
     def run_game(self) -> None:
         """Method to run the actual game"""
-        running = True
+        self._running = True
         time_delta = 0
         clock = pg.time.Clock()
-        while running:
-            for event in pg.event.get():
-                if event.type == pg.QUIT:
-                    running = False
-                if event.type == pg.MOUSEBUTTONDOWN:
-                    x, y = pg.mouse.get_pos()
-                    y, x = self.__get_coords__(y, x)
-                    piece = self._game.get(y, x)
-                    if not self._piece_selected and piece:
-                        if piece.color != self._game.current_player:
-                            continue
-                        self._piece_selected = True
-                        self._first_selected = y, x
-                        self._valid_moves = piece.valid_moves(y, x)
-                        self._piece_selected = piece
-                    elif self._piece_selected and (y, x) in self._valid_moves:
-                        target = self._game.get(y, x)
-                        moved = self._game.move(self._piece_selected, self._first_selected[0], self._first_selected[1], y, x)
-                        if moved:
-                            self._side_box.append_html_text(self._piece_selected.color.name + ' moved '
-                                                  + str(type(self._piece_selected).__name__))
-                            if target:
-                                self._side_box.append_html_text(' and captures ' + str(type(target).__name__))
-                            self._side_box.append_html_text('<br />')
-                            # computer_message = self._game._computer_move()
-                            # if computer_message:
-                            #     self._side_box.append_html_text(computer_message)
-                        else:
-                            self._side_box.append_html_text('Invalid move.  Would leave '
-                                                            + str(self._piece_selected.color.name) + ' in check.<br />')
-                        # if self._game.check(Color.WHITE):
-                        #     self._side_box.append_html_text("WHITE is in CHECK!<br />")
-                        if self._game.check(Color.BLACK):
-                            self._side_box.append_html_text("BLACK is in CHECK!<br />")
-                        # if self._game.mate(Color.WHITE):
-                        #     self._side_box.append_html_text("WHITE is in CHECKMATE!<br />GAME OVER!")
-                        if self._game.mate(Color.BLACK):
-                            self._side_box.append_html_text("BLACK is in CHECKMATE!<br />GAME OVER!")
-                        else:
-                            if moved and not self._game.mate(Color.BLACK):
-                                computer_message = self._game._computer_move()
-                        if computer_message and not self._game.mate(Color.BLACK):
-                            self._side_box.append_html_text(computer_message)
-                        if self._game.check(Color.WHITE):
-                            self._side_box.append_html_text("WHITE is in CHECK!<br />")
-                        if self._game.mate(Color.WHITE):
-                            self._side_box.append_html_text("WHITE is in CHECKMATE!<br />GAME OVER!")
-                        self._piece_selected = False
-                    else:
-                        self._piece_selected = False
-                if event.type == gui.UI_BUTTON_PRESSED:
-                    if event.ui_element == self._restart_button:
-                        self._game.reset()
-                        self._side_box.set_text("Restarting game...<br />")
-                    if event.ui_element == self._undo_button:
-                        if self._game.undo():
-                            self._side_box.append_html_text('Undoing move.<br />')
-                        else:
-                            self._side_box.append_html_text('Nothing to undo.<br />')
-            self._ui_manager.process_events(event)
-
-            self._screen.fill((255, 255, 255))
-            self.__draw_board__()
-            self._ui_manager.draw_ui(self._screen)
+        self._screen.fill((255, 255, 255))
+        pg.display.flip()
+        while self._running:
+            # Sleep until input arrives instead of spinning; a timed out wait returns NOEVENT.
+            events = [pg.event.wait(33)] + pg.event.get()
+            redraw = self._board_dirty
+            for event in events:
+                if event.type == pg.NOEVENT:
+                    continue
+                redraw = True
+                self._ui_manager.process_events(event)
+                handler = self._handlers.get(event.type)
+                if handler:
+                    handler(event)
+
             self._ui_manager.update(time_delta)
+            if redraw or self._board_dirty:
+                # Only the board and the UI elements ever change, so only they are cleared and sent to the display.
+                dirty = self.__draw_board__()
+                for element in self._ui_elements:
+                    dirty.append(self._screen.fill((255, 255, 255), element.rect))
+                self._ui_manager.draw_ui(self._screen)
+                pg.display.update(dirty)
+            # The wait above already paces the loop, so the clock only measures the time since the last frame.
+            time_delta = clock.tick() / 1000.0
+
+    def _on_quit(self, event: pg.event.Event) -> None:
+        """Stops the game loop once the window has been closed."""
+        self._running = False
+
+    def _on_click(self, event: pg.event.Event) -> None:
+        """Selects the clicked piece, or moves the selected piece to the clicked square.
+
+        Params:
+            event (pg.event.Event): The MOUSEBUTTONDOWN event holding where the user clicked."""
+        if self._ai_thinking:
+            return
+        x, y = event.pos
+        y, x = self.__get_coords__(y, x)
+        # Clicks on the side panel or the buttons aren't on the board. Without this they would be packed into
+        # y * 8 + x as a square further along the board.
+        if not (0 <= y < 8 and 0 <= x < 8):
+            return
+        piece = self._game.get(y, x)
+        if not self._piece_selected and piece:
+            if piece.color != self._game.current_player:
+                return
+            self._piece_selected = True
+            self._first_selected = y * 8 + x
+            self._valid_moves = piece.move_bits(y, x)
+            self._piece_selected = piece
+        elif self._piece_selected and self._valid_moves >> (y * 8 + x) & 1:
+            target = self._game.get(y, x)
+            sy, sx = divmod(self._first_selected, 8)
+            if self._game.move(self._piece_selected, sy, sx, y, x):
+                self._on_successful_move(target)
+            else:
+                self._side_box.append_html_text('Invalid move.  Would leave '
+                                                + COLOR_NAME[self._piece_selected.color] + ' in check.<br />')
+            self._piece_selected = False
+            self._valid_moves = 0
+        else:
+            self._piece_selected = False
+            self._valid_moves = 0
+
+    def _on_successful_move(self, target: Optional[Piece]) -> None:
+        """Reports the player's move that just took place and starts the computer's reply unless the game is over.
+
+        Params:
+            target (Optional[Piece]): The piece that was on the square moved to, or None if it was empty."""
+        self._board_dirty = True
+        # The whole report goes to the text box in one call since each call makes it lay its text out again.
+        message = self._piece_selected.move_text(target) + '<br />'
+        if self._game.check(Color.BLACK):
+            message += "BLACK is in CHECK!<br />"
+        mate_black = self._game.mate(Color.BLACK)
+        if mate_black:
+            message += "BLACK is in CHECKMATE!<br />GAME OVER!" + self._white_status()
+        self._side_box.append_html_text(message)
+        if not mate_black:
+            self._start_computer_move()
+
+    def _start_computer_move(self) -> None:
+        """Starts the computer's move on a worker thread so the window keeps responding while it thinks.
+
+        The board is rendered with the player's move first, since the worker will be trying out moves on
+        the game's board until it posts its _ai_event_type event."""
+        if self._board_dirty:
+            self._render_board_to(self._board_surface)
+            self._board_dirty = False
+        self._ai_thinking = True
+        threading.Thread(target=self._run_ai, daemon=True).start()
 
-            pg.display.flip()
-            time_delta = clock.tick(30) / 1000.0
+    def _run_ai(self) -> None:
+        """Performs the computer's move and posts its message back to the game loop.
+
+        The event is posted even if the move raises, otherwise _ai_thinking would never be cleared and every click
+        and button would be ignored from then on. The error itself is still raised and printed by the thread."""
+        message = 'The computer could not make its move.<br />'
+        try:
+            message = self._game._computer_move()
+        finally:
+            pg.event.post(pg.event.Event(self._ai_event_type, message=message))
+
+    def _on_ai_move(self, event: pg.event.Event) -> None:
+        """Shows the move the computer made once its worker thread is done.
+
+        Params:
+            event (pg.event.Event): The _ai_event_type event holding the computer's move message."""
+        self._ai_thinking = False
+        self._board_dirty = True
+        message = (event.message or '') + self._white_status()
+        if message:
+            self._side_box.append_html_text(message)
+
+    def _white_status(self) -> str:
+        """Returns the text telling the player if WHITE is in check or checkmate, empty if neither."""
+        status = ''
+        if self._game.check(Color.WHITE):
+            status += "WHITE is in CHECK!<br />"
+        if self._game.mate(Color.WHITE):
+            status += "WHITE is in CHECKMATE!<br />GAME OVER!"
+        return status
+
+    def _on_button(self, event: pg.event.Event) -> None:
+        """Resets the game or undoes the last move depending on which button was pressed.
+
+        Params:
+            event (pg.event.Event): The UI_BUTTON_PRESSED event holding the button that was pressed."""
+        if self._ai_thinking:
+            return
+        if event.ui_element == self._restart_button:
+            self._game.reset()
+            self._board_dirty = True
+            self._side_box.set_text("Restarting game...<br />")
+        if event.ui_element == self._undo_button:
+            if self._game.undo():
+                self._board_dirty = True
+                self._side_box.append_html_text('Undoing move.<br />')
+            else:
+                self._side_box.append_html_text('Nothing to undo.<br />')
 
     def __get_coords__(self, y: int, x: int) -> tuple[int, int]:
         """Returns two integers representing the coordinates the user clicked in a (y, x) format
@@ -122,27 +216,47 @@ class GUI:
         grid_y = y // 105
         return grid_y, grid_x
 
-    def __draw_board__(self) -> None:
-        """Draw/create board with correct colors in correct corresponding spots."""
-        count = 0
-        color = (255, 255, 255)
-        for y in range(0, 8):
-            for x in range(0, 8):
-                if count % 2 == 0:
-                    color = (255, 255, 255)
-                else:
-                    color = (127, 127, 127)
-                count = count + 1
-                pg.draw.rect(self._screen, color, pg.rect.Rect(x * 105, y * 105, 105, 105))
-                if self._piece_selected and (y, x) == self._first_selected:
-                    pg.draw.rect(self._screen, (255, 0, 0), pg.rect.Rect(x * 105, y * 105, 105, 105), 2)
-                if self._valid_moves and self._piece_selected and (y, x) in self._valid_moves:
-                    pg.draw.rect(self._screen, (0, 0, 255), pg.rect.Rect(x * 105, y * 105, 105, 105), 2)
-                if self._game.get(y, x):
-                    self._screen.blit(self._game.get(y, x)._image, (x * 105, y * 105))
-            count = count + 1
-        pg.draw.line(self._screen, (0, 0, 0), (0, 840), (840, 840))
-        pg.draw.line(self._screen, (0, 0, 0), (840, 840), (840, 0))
+    def __draw_board__(self) -> list[pg.Rect]:
+        """Draw the board onto the screen along with the highlights for the selected piece.
+
+        The squares and pieces are only redrawn onto _board_surface when the board has changed,
+        otherwise the cached surface from the last change is reused.
+
+        Returns:
+            dirty (list[pg.Rect]): The areas of the screen that were drawn over."""
+        if self._board_dirty:
+            self._render_board_to(self._board_surface)
+            self._board_dirty = False
+        screen = self._screen
+        dirty = [screen.blit(self._board_surface, (0, 0))]
+        piece_selected = self._piece_selected
+        first_selected = self._first_selected
+        valid_moves = self._valid_moves
+        square_rects = self._square_rects
+        if piece_selected:
+            pg.draw.rect(screen, (255, 0, 0), square_rects[first_selected], 2)
+            while valid_moves:
+                lowest = valid_moves & -valid_moves
+                pg.draw.rect(screen, (0, 0, 255), square_rects[lowest.bit_length() - 1], 2)
+                valid_moves ^= lowest
+        return dirty
+
+    def _render_board_to(self, surface: pg.Surface) -> None:
+        """Draw/create board with correct colors in correct corresponding spots along with the pieces and border.
+
+        Params:
+            surface (pg.Surface): The surface the board and its pieces will be drawn onto."""
+        # Take one snapshot of the game's squares rather than calling get, with its bounds checks, per square.
+        board = list(self._game._board)
+        piece_blits = []
+        for square in range(0, 64):
+            pg.draw.rect(surface, self._square_colors[square], self._square_rects[square])
+            if board[square]:
+                piece_blits.append((board[square]._image, self._square_rects[square]))
+        # Hand all the pieces to pygame in a single call rather than one blit call per piece.
+        surface.blits(piece_blits, doreturn=False)
+        pg.draw.line(surface, (0, 0, 0), (0, 840), (840, 840))
+        pg.draw.line(surface, (0, 0, 0), (840, 840), (840, 0))
 
 
 def main() -> None:
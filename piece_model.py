@@ -4,16 +4,17 @@ Authors: Alec Mirambeau, Allison Scheffer, Lauren Mcguirk
 """
 
 from __future__ import annotations
-from enum import Enum
+from enum import IntEnum
 import abc
 import pygame
 from typing import *
 import random
 
 
-class Color(Enum):
+class Color(IntEnum):
     '''
-    Enumeration class for color of chess pieces/players
+    Enumeration class for color of chess pieces/players. The colors are ints, so comparing and hashing them
+    is plain integer work rather than a call into Enum.__eq__ or Enum.__hash__.
     Statics:
         WHITE (int): An integer representing the enumerated value of the white static variable
         BLACK (int): An integer representing the enumerated value of the black static variable
@@ -23,17 +24,290 @@ class Color(Enum):
     BLACK = 1
 
 
+# The name of each color as it is shown to the player.
+COLOR_NAME = {Color.WHITE: "WHITE", Color.BLACK: "BLACK"}
+# The opposing color of each color, indexed by color.value.
+OPPONENT = (Color.BLACK, Color.WHITE)
+
+# The type of each piece as an integer. These follow the order of the pieces on pieces.png and index
+# the Game bitboards as color.value * 6 + piece type.
+KING = 0
+QUEEN = 1
+BISHOP = 2
+KNIGHT = 3
+ROOK = 4
+PAWN = 5
+
+# What each piece type is worth to the AI's search, indexed by piece type. A king is never captured, so it's worth
+# nothing on top of the checkmate scores.
+PIECE_VALUES = (0, 900, 330, 320, 500, 100)
+# How many moves ahead the AI searches, counting the moves of both colors.
+SEARCH_DEPTH = 3
+# The score of being checkmated, further below any difference in material than a board can get.
+MATE_SCORE = 1 << 20
+# Whether a score the AI's search kept for a board is its exact score, or only a lower or upper bound on it.
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# The answers already worked out for a (Game method, color, board hash), so check and mate are only
+# worked out once for each board no matter how many times the GUI and the AI ask about it.
+_STATUS_CACHE: dict[tuple[str, Color, int], bool] = {}
+# The most entries the status cache holds before it is emptied.
+STATUS_CACHE_SIZE = 1 << 12
+
+
+def _memoize_status(status: Callable) -> Callable:
+    """Decorator caching a Game method answering a question about one color's king on the Zobrist hash of the board.
+
+    The method must only depend on the pieces on the board and leave the game as it found it."""
+    def cached_status(self: Game, color: Color) -> bool:
+        key = (status.__name__, color, self._zobrist)
+        result = _STATUS_CACHE.get(key)
+        if result is None:
+            if len(_STATUS_CACHE) >= STATUS_CACHE_SIZE:
+                _STATUS_CACHE.clear()
+            result = _STATUS_CACHE[key] = status(self, color)
+        return result
+    cached_status.__doc__ = status.__doc__
+    return cached_status
+
+# The (y, x) step of each direction a piece can slide in, in the order their moves are listed.
+DIAGONALS = ((-1, 1), (-1, -1), (1, 1), (1, -1))
+HORIZONTALS = ((0, -1), (0, 1))
+VERTICALS = ((-1, 0), (1, 0))
+# The (y, x) jumps a knight can make from its square.
+KNIGHT_JUMPS = ((1, -2), (-1, -2), (2, -1), (-2, -1), (2, 1), (-2, 1), (1, 2), (-1, 2))
+
+# The (y, x) location of each square y * 8 + x, so the same tuples are handed out instead of new ones.
+SQUARES = tuple(divmod(square, 8) for square in range(64))
+
+
+def _steps_bitboard(square: int, steps: tuple[tuple[int, int], ...]) -> int:
+    """Returns the bitboard of the squares one (y, x) step away from the passed square that are on the board."""
+    y, x = SQUARES[square]
+    bits = 0
+    for y_d, x_d in steps:
+        if 0 <= y + y_d < 8 and 0 <= x + x_d < 8:
+            bits |= 1 << ((y + y_d) * 8 + x + x_d)
+    return bits
+
+
+def _ray(square: int, y_d: int, x_d: int) -> tuple[tuple[int, int], ...]:
+    """Returns the (y, x) location of every square from the passed square to the edge of the board in one direction."""
+    y, x = SQUARES[square]
+    ray = []
+    y += y_d
+    x += x_d
+    while 0 <= y < 8 and 0 <= x < 8:
+        ray.append(SQUARES[y * 8 + x])
+        y += y_d
+        x += x_d
+    return tuple(ray)
+
+
+# Everything below only depends on the square a piece is on, so it is worked out once when the module loads.
+# The bitboard of the squares a knight or king can reach from each square.
+KNIGHT_ATTACKS = tuple(_steps_bitboard(square, KNIGHT_JUMPS) for square in range(64))
+KING_ATTACKS = tuple(_steps_bitboard(square, DIAGONALS + HORIZONTALS + VERTICALS) for square in range(64))
+# Every square of the board, and every square except those in column 0 (NOT_FILE_A) or column 7 (NOT_FILE_H).
+# A pawn capture shifted off one side of the board wraps onto the far column of the next row, so the far
+# column is masked off afterwards.
+FULL_BOARD = (1 << 64) - 1
+NOT_FILE_A = FULL_BOARD ^ sum(1 << (y * 8) for y in range(8))
+NOT_FILE_H = FULL_BOARD ^ sum(1 << (y * 8 + 7) for y in range(8))
+# The row a pawn of each color lands on after a single push from its starting row, indexed by color.value.
+# Only pawns that have never moved can make a second push from there.
+PAWN_PUSHED_ROW = (0xFF << 40, 0xFF << 16)
+# The row a pawn of each color is promoted on, indexed by color.value.
+PROMOTION_ROW = (0, 7)
+# The squares out to the edge of the board in each direction from each square, indexed by direction then square.
+RAYS = {direction: tuple(_ray(square, *direction) for square in range(64))
+        for direction in DIAGONALS + HORIZONTALS + VERTICALS}
+
+
+def _slide_bitboard(square: int, occupied: int, directions: tuple[tuple[int, int], ...]) -> int:
+    """Returns the bitboard of the squares a piece on the passed square slides to in the directions, given the
+    bitboard of occupied squares. Each slide includes the first occupied square it runs into."""
+    bits = 0
+    for direction in directions:
+        for y, x in RAYS[direction][square]:
+            bits |= 1 << (y * 8 + x)
+            if occupied >> (y * 8 + x) & 1:
+                break
+    return bits
+
+
+def _blocker_mask(square: int, directions: tuple[tuple[int, int], ...]) -> int:
+    """Returns the bitboard of the squares that can block a slide from the passed square in the directions.
+
+    The last square of each ray is left out, since a piece there can never stop the slide any earlier."""
+    bits = 0
+    for direction in directions:
+        for y, x in RAYS[direction][square][:-1]:
+            bits |= 1 << (y * 8 + x)
+    return bits
+
+
+def _slide_table(square: int, mask: int, directions: tuple[tuple[int, int], ...]) -> dict[int, int]:
+    """Returns the slide bitboard from the passed square for every combination of blockers within mask."""
+    table = {}
+    blockers = 0
+    while True:
+        table[blockers] = _slide_bitboard(square, blockers, directions)
+        # Step to the next subset of mask (the "carry-rippler" trick), wrapping back to 0 after the last.
+        blockers = (blockers - mask) & mask
+        if blockers == 0:
+            return table
+
+
+# Sliding moves are looked up rather than walked: the blockers on a square's rays are masked out of the
+# occupied bitboard and used as the key into that square's table, like magic bitboards do without needing
+# the magic multiply since a dict already hashes the key. Indexed by square.
+ROOK_MASKS = tuple(_blocker_mask(square, VERTICALS + HORIZONTALS) for square in range(64))
+ROOK_TABLES = tuple(_slide_table(square, ROOK_MASKS[square], VERTICALS + HORIZONTALS) for square in range(64))
+BISHOP_MASKS = tuple(_blocker_mask(square, DIAGONALS) for square in range(64))
+BISHOP_TABLES = tuple(_slide_table(square, BISHOP_MASKS[square], DIAGONALS) for square in range(64))
+# The squares a rook or bishop on each square reaches on an empty board, the lines a slider has to stand on to
+# have any chance of attacking that square.
+ROOK_LINES = tuple(ROOK_TABLES[square][0] for square in range(64))
+BISHOP_LINES = tuple(BISHOP_TABLES[square][0] for square in range(64))
+
+
+# The move generators below only work on the board list, bitboards, and the tables above, so they can be
+# called straight from each piece's move_bits with no bounds checks in their loops.
+
+def _bits_to_moves(bits: int) -> list[tuple[int, int]]:
+    """Returns the (y, x) location of every square set in the passed bitboard, from the lowest square up."""
+    # Appending beats filling a [None] * bits.bit_count() list by index here: a piece has at most 27 moves, so
+    # the list only resizes a couple of times, while indexing costs an extra counter on every square.
+    moves = []
+    while bits:
+        lowest = bits & -bits
+        moves.append(SQUARES[lowest.bit_length() - 1])
+        bits ^= lowest
+    return moves
+
+
+def _rook_attacks(square: int, occupied: int) -> int:
+    """Returns the bitboard of the squares a rook on the passed square reaches given the occupied bitboard."""
+    return ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+
+
+def _bishop_attacks(square: int, occupied: int) -> int:
+    """Returns the bitboard of the squares a bishop on the passed square reaches given the occupied bitboard."""
+    return BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+
+
+def _rook_bits(occupied: int, own: int, square: int) -> int:
+    """Returns the move bitboard for a rook on square: every slide along its row and column that doesn't land on
+    own, the bitboard of its side."""
+    return _rook_attacks(square, occupied) & ~own
+
+
+def _bishop_bits(occupied: int, own: int, square: int) -> int:
+    """Returns the move bitboard for a bishop on square: every slide along its diagonals that doesn't land on
+    own, the bitboard of its side."""
+    return _bishop_attacks(square, occupied) & ~own
+
+
+def _queen_bits(occupied: int, own: int, square: int) -> int:
+    """Returns the move bitboard for a queen on square: the rook and bishop slides together, in a single pass that
+    masks off own, the bitboard of its side, once."""
+    return (_rook_attacks(square, occupied) | _bishop_attacks(square, occupied)) & ~own
+
+
+def _knight_bits(own: int, square: int) -> int:
+    """Returns the move bitboard for a knight on square: every jump onto a square not in own, the bitboard of its side."""
+    return KNIGHT_ATTACKS[square] & ~own
+
+
+def _king_bits(own: int, square: int) -> int:
+    """Returns the move bitboard for a king on square: every step onto a square not in own, the bitboard of its side."""
+    return KING_ATTACKS[square] & ~own
+
+
+def _pawn_attacks(pawns: int, color: Color) -> int:
+    """Returns the bitboard of every square the pawns of the passed color capture on, occupied or not."""
+    if color == Color.WHITE:
+        return ((pawns >> 9) & NOT_FILE_H) | ((pawns >> 7) & NOT_FILE_A)
+    return (((pawns << 7) & NOT_FILE_H) | ((pawns << 9) & NOT_FILE_A)) & FULL_BOARD
+
+
+def _pawn_bits(pawns: int, occupied: int, enemy: int, color: Color) -> int:
+    """Returns the move bitboard for the pawns of the passed color, all at once.
+
+    A pawn moves one empty square forward, or two from its starting row if both are empty. It captures
+    an opposing piece one square diagonally forward. WHITE moves up the board (to lower squares), BLACK
+    moves down it.
+
+    Params:
+        pawns (int): The bitboard of the pawns to move.
+        occupied (int): The bitboard of every square with a piece on it.
+        enemy (int): The bitboard of every square with an opposing piece on it.
+        color (Color): The color of the pawns.
+
+    Returns:
+        bits (int): The bitboard of each square any of the pawns can move to."""
+    empty = ~occupied & FULL_BOARD
+    if color == Color.WHITE:
+        pushes = (pawns >> 8) & empty
+        pushes |= ((pushes & PAWN_PUSHED_ROW[0]) >> 8) & empty
+    else:
+        pushes = (pawns << 8) & empty
+        pushes |= ((pushes & PAWN_PUSHED_ROW[1]) << 8) & empty
+    return pushes | (_pawn_attacks(pawns, color) & enemy)
+
+
+def _square_attacked(bb: list[int], occupied: int, square: int, color: Color) -> bool:
+    """Returns if a piece of the opposing color of the passed color attacks square.
+
+    Attacks are symmetric, so rather than generating every opposing piece's moves this looks outwards from the
+    square: an opposing knight on a square a knight could jump to from it attacks it, an opposing rook or queen on
+    a square a rook would slide to from there attacks it, and so on. The sliding pieces are the likeliest attackers
+    so they are tried first, and the slide itself is only looked up when one of them stands on a line through
+    the square at all.
+
+    Params:
+        bb (list[int]): The twelve piece bitboards, indexed by color.value * 6 + piece type.
+        occupied (int): The bitboard of every square with a piece on it.
+        square (int): The square to test, packed as y * 8 + x.
+        color (Color): The color being attacked.
+
+    Returns:
+        A boolean, True if any opposing piece attacks the square."""
+    opponent = OPPONENT[color] * 6
+    queens = bb[opponent + QUEEN]
+    rooks = bb[opponent + ROOK] | queens
+    bishops = bb[opponent + BISHOP] | queens
+    return bool(rooks & ROOK_LINES[square] and _rook_attacks(square, occupied) & rooks
+                or bishops & BISHOP_LINES[square] and _bishop_attacks(square, occupied) & bishops
+                or KNIGHT_ATTACKS[square] & bb[opponent + KNIGHT]
+                or _pawn_attacks(1 << square, color) & bb[opponent + PAWN]
+                or KING_ATTACKS[square] & bb[opponent + KING])
+
+
 class Piece(abc.ABC):
     """A chess piece.
 
     Hold methods and data associated with chess pieces.
 
     Attributes:
-        color (Color): A static variable of Color representing the color of this chess piece."""
-    # Make a static variable (not an instance variable) that holds the path to this image.
+        color (Color): A static variable of Color representing the color of this chess piece.
+        NAME (str): The name of the piece type as it is shown to the player.
+        PIECE_TYPE (int): The integer type of this piece, one of KING, QUEEN, BISHOP, KNIGHT, ROOK, or PAWN.
+        SPRITESHEET (Optional[pygame.Surface]): The image of every piece, loaded by load_spritesheet.
+        _IMAGE_CACHE (dict[tuple[type, Color], pygame.Surface]): The image of each kind of piece, shared by
+            every piece of that type and color."""
+    # Make a static variable (not an instance variable) that holds the image of all the chess pieces.
     # Have to make an images directory in the current directory that will hold the images of all the chess pieces.
-    SPRITESHEET = pygame.image.load("./images/pieces.png")
+    SPRITESHEET: Optional[pygame.Surface] = None
+    _IMAGE_CACHE: dict[tuple[type, Color], pygame.Surface] = {}
     _game = 0
+    NAME = "Piece"
+    PIECE_TYPE = -1
+    # Pieces only ever hold these attributes, so they don't each need an instance __dict__.
+    __slots__ = ('_color', '_image')
 
     @staticmethod
     def set_game(game: Game) -> None:
@@ -51,13 +325,24 @@ class Piece(abc.ABC):
             raise ValueError("You must provide a valid Game instance.")
         Piece._game = game
 
+    @classmethod
+    def load_spritesheet(cls) -> None:
+        """Loads the sprite sheet of every piece the first time it's called.
+
+        When a display is already open the sheet is converted to its pixel format, so every piece image cut from
+        it blits without being converted again. Game calls this before setting up any pieces."""
+        if cls.SPRITESHEET is None:
+            sheet = pygame.image.load("./images/pieces.png")
+            if pygame.display.get_surface() is not None:
+                sheet = sheet.convert_alpha()
+            Piece.SPRITESHEET = sheet
+
     def __init__(self, color: Color) -> None:
         """Initialize this Piece instance with the correct data (image and color passed as argument).
 
         Params:
             color (Color): A color representing the color of this chess piece."""
         self._color = color
-        self._image = pygame.Surface((105, 105), pygame.SRCALPHA)
 
     @property
     def color(self) -> Color:
@@ -67,6 +352,15 @@ class Piece(abc.ABC):
         """
         return self._color
 
+    def move_text(self, captured: Optional[Piece] = None) -> str:
+        """Returns the text telling the player this piece moved, and what it captured if it took a piece.
+
+        Params:
+            captured (Optional[Piece]): The piece that was on the square moved to, or None if it was empty."""
+        if captured is None:
+            return COLOR_NAME[self._color] + ' moved ' + self.NAME
+        return COLOR_NAME[self._color] + ' moved ' + self.NAME + ' and captures ' + captured.NAME
+
     def set_image(self, x: int, y: int) -> None:
         """
         Sets the image of the piece calling this method.
@@ -75,280 +369,29 @@ class Piece(abc.ABC):
             x (int): integer value to represent horizontal location on piece.png from ./images directory.
             y (int): integer value to represent vertical location on piece.png from ./images directory.
         """
-        self._image.blit(Piece.SPRITESHEET, (0, 0), pygame.rect.Rect(x, y, 105, 105))
-
-    def _diagonal_moves(self, y: int, x: int, y_d: int, x_d: int, distance: int) -> list[tuple[int, int]]:
-        """Returns all valid diagonal moves for a piece given it's position on the board.
-
-        params:
-            y (int): An integer representing the current y position on the board.
-            x (int): An integer representing the current x position on the board.
-            y_d (int): An integer representing the vertical direction from the piece's location to check.
-            x_d (int): An integer representing the horizontal direction from the piece's location to check.
-            distance (int): An integer that represents how far the (y,x) direction we want to check.
-
-        Returns:
-            valid_moves (list[tuple[int]]): The valid moves for the piece at this location."""
-        # (y,x) is the way the tuples are formed
-        valid_moves = []
-        # this checks for when the piece is moving diagonal down and to the right.
-        # We start the range loop at 1 because we don't want to check the spot where the piece
-        # that is doing the moving is located. We end at distance + 1 because a queen can move 8
-        # spaces at a time, and a pawn can only move 1. So, if we just used the distance value it
-        # wouldn't work for a pawn because that would be a range loop from 1 to 1 (so nothing
-        # would happen. With distance + 1 and with an if statement making sure only valid indexes
-        # are going to be used we can then have this for loop work for queens and pawns.
-        for i in range(1, (distance + 1)):
-            # Checks diagonally down and to the right
-            if y_d == 1 and x_d == 1:
-                # make sure only valid indexes are checked.
-                if 0 <= y + i < 8 and 0 <= x + i < 8:
-                    # checks if there's a piece already at this location
-                    if Piece._game.get((y + i), (x + i)) is None:
-                        # If there isn't a piece, then this is a valid move so append it to the list
-                        # of valid moves
-                        valid_moves.append(((y + i), (x + i)))
-                    # If there is a piece, check if it is the same color as the current moving piece.
-                    elif Piece._game.get((y + i), (x + i)).color != self.color:
-                        # If the piece aren't the same color, then this is a valid move and add it to
-                        # the list.
-                        valid_moves.append(((y + i), (x + i)))
-                        break
-                    else:
-                        break
-            # checks down and to the left diagonally.
-            elif y_d == 1 and x_d == -1:
-                # make sure only valid indexes are checked
-                if 0 <= y + i < 8 and 0 <= x - i < 8:
-                    # checks if there's already a piece at this location
-                    if Piece._game.get((y + i), (x - i)) is None:
-                        # If there isn't a piece, then this is a valid move so append it to the list
-                        # of valid moves
-                        valid_moves.append(((y + i), (x - i)))
-                    # If there is a piece, check if it is the same color as the current moving piece.
-                    elif Piece._game.get((y + i), (x - i)).color != self.color:
-                        # If the piece aren't the same color, then this is a valid move and add it to
-                        # the list.
-                        valid_moves.append(((y + i), (x - i)))
-                        break
-                    else:
-                        break
-            # checks up and to the left diagonally.
-            elif y_d == -1 and x_d == -1:
-                # make sure only valid indexes are checked
-                if 0 <= y - i < 8 and 0 <= x - i < 8:
-                    # checks if there's already a piece at this location
-                    if Piece._game.get((y - i), (x - i)) is None:
-                        # If there isn't a piece, then this is a valid move so append it to the list
-                        # of valid moves
-                        valid_moves.append(((y - i), (x - i)))
-                    # If there is a piece, check if it is the same color as the current moving piece.
-                    elif Piece._game.get((y - i), (x - i)).color != self.color:
-                        # If the piece aren't the same color, then this is a valid move and add it to
-                        # the list.
-                        valid_moves.append(((y - i), (x - i)))
-                        break
-                    else:
-                        break
-            # checks up and to the right diagonally.
-            elif y_d == -1 and x_d == 1:
-                # make sure only valid indexes are checked
-                if 0 <= y - i < 8 and 0 <= x + i < 8:
-                    # checks if there's already a piece at this location
-                    if Piece._game.get((y - i), (x + i)) is None:
-
-                        # If there isn't a piece, then this is a valid move so append it to the list
-                        # of valid moves
-                        valid_moves.append(((y - i), (x + i)))
-                    # If there is a piece, check if it is the same color as the current moving piece.
-                    elif Piece._game.get((y - i), (x + i)).color != self.color:
-                        # If the piece aren't the same color, then this is a valid move and add it to
-                        # the list.
-                        valid_moves.append(((y - i), (x + i)))
-                        break
-                    else:
-                        break
-        return valid_moves
-
-    def _horizontal_moves(self, y: int, x: int, y_d: int, x_d: int, distance: int) -> list[tuple[int, int]]:
-        """Returns all valid horizontal moves for a piece given it's position on the board.
-
-        params:
-            y (int): An integer representing the row number of the piece's current location
-            x (int) An integer representing the column number of the piece' current location.
-            y_d (int): An integer representing the vertical direction from the piece's location to check.
-            x_d (int): An integer representing the horizontal direction from the piece's location to check.
-            distance (int): An integer that represents how far the (y,x) direction we want to check.
-
-        Returns:
-            valid_moves (list[tuple[int]]): The valid moves for the piece at this location."""
-        valid_moves = []
-        for i in range(1, (distance + 1)):
-            # Check spots to the right of this piece's current location.
-            if x_d == 1:
-                # make sure only valid indexes are checked.
-                if 0 <= x + i < 8:
-                    # checks if there's a piece already at this location
-                    if Piece._game.get(y, (x + i)) is None:
-                        # If there isn't a piece, then this is a valid move so append it to the list
-                        # of valid moves
-                        valid_moves.append((y, (x + i)))
-                    # If there is a piece, check if it is the same color as the current moving piece.
-                    elif Piece._game.get(y, (x + i)).color != self.color:
-                        # If the piece aren't the same color, then this is a valid move and add it to
-                        # the list.
-                        valid_moves.append((y, (x + i)))
-                        break
-                    else:
-                        break
-            # Check spots to the left of this piece's current location.
-            elif x_d == -1:
-                # make sure only valid indexes are checked.
-                if 0 <= x - i < 8:
-                    # checks if there's a piece already at this location
-                    if Piece._game.get(y, (x - i)) is None:
-                        # If there isn't a piece, then this is a valid move so append it to the list
-                        # of valid moves
-                        valid_moves.append((y, (x - i)))
-                    # If there is a piece, check if it is the same color as the current moving piece.
-                    elif Piece._game.get(y, (x - i)).color != self.color:
-                        # If the piece aren't the same color, then this is a valid move and add it to
-                        # the list.
-                        valid_moves.append((y, (x - i)))
-                        break
-                    else:
-                        break
-        return valid_moves
-
-    def _vertical_moves(self, y: int, x: int, y_d: int, x_d: int, distance: int) -> list[tuple[int, int]]:
-        """Returns all valid vertical moves for a piece given it's position on the board.
-
-        params:
-            y (int): An integer representing the row number of the piece's current location
-            x (int) An integer representing the column number of the piece' current location.
-            y_d (int): An integer representing the vertical direction from the piece's location to check.
-            x_d (int): An integer representing the horizontal direction from the piece's location to check.
-            distance (int): An integer that represents how far the (y,x) direction we want to check.
-
-        Returns:
-            valid_moves (list[tuple[int]]): The valid moves for the piece at this location."""
-        valid_moves = []
-        for i in range(1, (distance + 1)):
-            # Check spots below this piece's current location.
-            if y_d == 1:
-                # make sure only valid indexes are checked.
-                if 0 <= y + i < 8:
-                    # checks if there's a piece already at this location
-                    if Piece._game.get((y + i), x) is None:
-                        # If there isn't a piece, then this is a valid move so append it to the list
-                        # of valid moves
-                        valid_moves.append(((y + i), x))
-                    # If there is a piece, check if it is the same color as the current moving piece.
-                    elif Piece._game.get((y + i), x).color != self.color:
-                        # If the piece aren't the same color, then this is a valid move and add it to
-                        # the list.
-                        valid_moves.append(((y + i), x))
-                        break
-                    else:
-                        break
-            # Check spots to above this piece's current location.
-            elif y_d == -1:
-                # make sure only valid indexes are checked.
-                if 0 <= y - i < 8:
-                    # checks if there's a piece already at this location
-                    if Piece._game.get((y - i), x) is None:
-                        # If there isn't a piece, then this is a valid move so append it to the list
-                        # of valid moves
-                        valid_moves.append(((y - i), x))
-                    # If there is a piece, check if it is the same color as the current moving piece.
-                    elif Piece._game.get((y - i), x).color != self.color:
-                        # If the piece aren't the same color, then this is a valid move and add it to
-                        # the list.
-                        valid_moves.append(((y - i), x))
-                        break
-                    else:
-                        break
-        return valid_moves
-
-    def get_diagonal_moves(self, y: int, x: int, distance: int) -> list[tuple[int, int]]:
-        """Returns all valid diagonal moves of the chess piece calling this method.
-
-        Given a specified position on the board, and the distance the piece calling this method can travel.
-        This method will return all the allowable diagonal moves by this piece.
-
-        Params:
-            y (int): An integer representing the y position of this piece (the row number of this piece).
-            x (int): An integer representing the x position of this piece (the colum number of this piece).
-            distance (int): An integer representing the distance number this piece can travel.
-
-        Returns:
-                moves (list[tuple[int, int]]): A list containing tuples of two integers that represent the valid
-                    moves in the diagonal direction by this chess piece."""
-        moves = []
-        moves += (self._diagonal_moves(y, x, -1, 1, distance))
-        moves += (self._diagonal_moves(y, x, -1, -1, distance))
-        moves += (self._diagonal_moves(y, x, 1, 1, distance))
-        moves += (self._diagonal_moves(y, x, 1, -1, distance))
-        return moves
-
-    def get_horizontal_moves(self, y: int, x: int, distance: int) -> list[tuple[int, int]]:
-        """Returns all valid horizontal moves of the chess piece calling this method.
-
-        Given a specified position on the board, and the distance the piece calling this method can travel.
-        This method will return all the allowable horizontal moves by this piece.
-
-        Params:
-            y (int): An integer representing the y position of this piece (the row number of this piece).
-            x (int): An integer representing the x position of this piece (the colum number of this piece).
-            distance (int): An integer representing the distance number this piece can travel.
-
-        Returns:
-                moves (list[tuple[int, int]]): A list containing tuples of two integers that represent the valid
-                    moves in the horizontal direction by this chess piece."""
-        moves = []
-        # add moves to the left.
-        moves += (self._horizontal_moves(y, x, 0, -1, distance))
-        # add moves to the right.
-        moves += (self._horizontal_moves(y, x, 0, 1, distance))
-        return moves
-
-    def get_vertical_moves(self, y: int, x: int, distance: int) -> list[tuple[int, int]]:
-        """Returns all valid vertical moves of the chess piece calling this method.
-
-        Given a specified position on the board, and the distance the piece calling this method can travel.
-        This method will return all the allowable vertical moves by this piece.
-
-        Params:
-            y (int): An integer representing the y position of this piece (the row number of this piece).
-            x (int): An integer representing the x position of this piece (the colum number of this piece).
-            distance (int): An integer representing the distance number this piece can travel.
-
-        Returns:
-                moves (list[tuple[int, int]]): A list containing tuples of two integers that represent the
-                    location of each valid move in the vertical direction by this chess piece."""
-        moves = []
-        # Check moves in the up direction
-        moves += (self._vertical_moves(y, x, -1, 0, distance))
-        # Check moves in the down direction.
-        moves += (self._vertical_moves(y, x, 1, 0, distance))
-        return moves
+        # Every piece of a type and color looks the same, so they share one image rather than each piece cutting
+        # its own out of the sprite sheet.
+        key = (type(self), self._color)
+        image = Piece._IMAGE_CACHE.get(key)
+        if image is None:
+            # A subsurface shares the sheet's pixels, and its already converted format, instead of copying them.
+            # The tiles along the right and bottom edges run a few pixels past the sheet, so they're clipped to it.
+            sheet = Piece.SPRITESHEET
+            image = sheet.subsurface(pygame.rect.Rect(x, y, 105, 105).clip(sheet.get_rect()))
+            Piece._IMAGE_CACHE[key] = image
+        self._image = image
 
     @abc.abstractmethod
-    def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
-        """Returns all the valid moves for this piece type at it's given location.
+    def move_bits(self, y: int, x: int) -> int:
+        """Returns the bitboard of all the valid moves for this piece type at it's given location.
 
         Params:
             y (int): An integer representing the row number of this piece.
             x (int): An integer representing the column number of this piece.
 
         Returns:
-            valid_moves (list[tuple[int, int]]): A list containing tuples of two integers representing the
-            (row number, column number) of each of the valid moves that can be done by this piece."""
-        pass
-
-    @abc.abstractmethod
-    def copy(self):
-        """Copies the state of the board with all the pieces and their current location."""
+            bits (int): A bitboard with bit y * 8 + x set for each (row number, column number) this piece can
+            move to."""
         pass
 
 
@@ -363,23 +406,18 @@ class King(Piece):
 
     Attributes:
         See base class."""
+    NAME = "King"
+    PIECE_TYPE = KING
+    __slots__ = ()
 
     def __init__(self, color: Color):
         """Initialize this King instance with the correct data."""
         super().__init__(color)
         self.set_image(0, color.value * 105)
 
-    def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
+    def move_bits(self, y: int, x: int) -> int:
         """see base class."""
-        valid_moves = []
-        valid_moves += (self.get_diagonal_moves(y, x, 1))
-        valid_moves += (self.get_horizontal_moves(y, x, 1))
-        valid_moves += self.get_vertical_moves(y, x, 1)
-        return valid_moves
-
-    def copy(self) -> 'King':
-        """Returns a king instance of the same color as the piece calling this method."""
-        return King(self.color)
+        return _king_bits(Piece._game._occ[self._color.value], y * 8 + x)
 
 
 class Queen(Piece):
@@ -390,6 +428,9 @@ class Queen(Piece):
 
     Attributes:
         see base class."""
+    NAME = "Queen"
+    PIECE_TYPE = QUEEN
+    __slots__ = ()
 
     def __init__(self, color: Color):
         """Initialize this queen instance with the correct data.
@@ -399,17 +440,10 @@ class Queen(Piece):
         super().__init__(color)
         self.set_image(105, color.value * 105)
 
-    def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
+    def move_bits(self, y: int, x: int) -> int:
         """see base class."""
-        valid_moves = []
-        valid_moves += (self.get_diagonal_moves(y, x, 8))
-        valid_moves += (self.get_horizontal_moves(y, x, 8))
-        valid_moves += self.get_vertical_moves(y, x, 8)
-        return valid_moves
-
-    def copy(self) -> 'Queen':
-        """Returns a Queen instance of the same color as the piece calling this method."""
-        return Queen(self.color)
+        occ = Piece._game._occ
+        return _queen_bits(occ[0] | occ[1], occ[self._color.value], y * 8 + x)
 
 
 class Bishop(Piece):
@@ -421,6 +455,9 @@ class Bishop(Piece):
     Attributes:
         see base class
  """
+    NAME = "Bishop"
+    PIECE_TYPE = BISHOP
+    __slots__ = ()
 
     def __init__(self, color: Color) -> None:
         """Initializes this Bishop instance with the correct data.
@@ -430,15 +467,10 @@ class Bishop(Piece):
         super().__init__(color)
         self.set_image(210, color.value * 105)
 
-    def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
+    def move_bits(self, y: int, x: int) -> int:
         """see base class."""
-        valid_moves = []
-        valid_moves += self.get_diagonal_moves(y, x, 8)
-        return valid_moves
-
-    def copy(self) -> 'Bishop':
-        """Returns a Bishop instance of the same color as the piece calling this method."""
-        return Bishop(self.color)
+        occ = Piece._game._occ
+        return _bishop_bits(occ[0] | occ[1], occ[self._color.value], y * 8 + x)
 
 
 class Knight(Piece):
@@ -449,6 +481,9 @@ class Knight(Piece):
 
     Attributes:
         see base class."""
+    NAME = "Knight"
+    PIECE_TYPE = KNIGHT
+    __slots__ = ()
 
     def __init__(self, color: Color) -> None:
         """Initializes this Knight instance with the correct data.
@@ -458,53 +493,13 @@ class Knight(Piece):
         super().__init__(color)
         self.set_image(315, color.value * 105)
 
-    def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
+    def move_bits(self, y: int, x: int) -> int:
         '''
         :param y: int y position on chess board (horizontal)
         :param x: int x position on chess board (vertical)
-        :return: list of tuples of all valid moves for piece passed through parameters
+        :return: bitboard of all valid moves for piece passed through parameters
         '''
-        valid_moves = []
-        for a in range(-2, 3):
-            if a == -1:
-                if 0 <= x + a < 8 and 0 <= y + 2 < 8:
-                    valid_moves.append((y + 2, x + a))
-                if 0 <= x + a < 8 and 0 <= y - 2 < 8:
-                    valid_moves.append((y - 2, x + a))
-            if a == 1:
-                if 0 <= x + a < 8 and 0 <= y + 2 < 8:
-                    valid_moves.append((y + 2, x + a))
-                if 0 <= x + a < 8 and 0 <= y - 2 < 8:
-                    valid_moves.append((y - 2, x + a))
-            if a == 2:
-                if 0 <= x + a < 8 and 0 <= y + 1 < 8:
-                    valid_moves.append((y + 1, x + a))
-                if 0 <= x + a < 8 and 0 <= y - 1 < 8:
-                    valid_moves.append((y - 1, x + a))
-            if a == -2:
-                if 0 <= x + a < 8 and 0 <= y + 1 < 8:
-                    valid_moves.append((y + 1, x + a))
-                if 0 <= x + a < 8 and 0 <= y - 1 < 8:
-                    valid_moves.append((y - 1, x + a))
-
-        real_valid_moves = []
-        # this is where it will all fall apart
-        # filters out only the valid moves from the valid moves list.
-        for element in valid_moves:
-            y1, x1 = element
-            if Piece._game.get(y1, x1) is None:
-                real_valid_moves.append(element)
-            elif Piece._game.get(y1, x1).color != self.color:
-                real_valid_moves.append(element)
-
-        return real_valid_moves
-
-        # elif Piece._game.get(y1, x1) is not None:
-        #     valid_moves.remove(element)
-
-    def copy(self) -> 'Knight':
-        """Returns a Knight instance of the same color as the piece calling this method."""
-        return Knight(self.color)
+        return _knight_bits(Piece._game._occ[self._color.value], y * 8 + x)
 
 
 class Rook(Piece):
@@ -515,6 +510,9 @@ class Rook(Piece):
 
     Attributes:
         see base class."""
+    NAME = "Rook"
+    PIECE_TYPE = ROOK
+    __slots__ = ()
 
     def __init__(self, color: Color) -> None:
         """Initializes this Rook instance with the correct data.
@@ -524,82 +522,62 @@ class Rook(Piece):
         super().__init__(color)
         self.set_image(420, color.value * 105)
 
-    def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
+    def move_bits(self, y: int, x: int) -> int:
         """see base class."""
-        valid_moves = []
-        valid_moves += self.get_vertical_moves(y, x, 8)
-        valid_moves += self.get_horizontal_moves(y, x, 8)
-        return valid_moves
-
-    def copy(self) -> 'Rook':
-        """Returns a Bishop instance of the same color as the piece calling this method."""
-        return Rook(self.color)
+        occ = Piece._game._occ
+        return _rook_bits(occ[0] | occ[1], occ[self._color.value], y * 8 + x)
 
 
 class Pawn(Piece):
     """A Pawn Chess Piece.
 
     Holds the methods and data associated with a Pawn chess piece for a chess game to function
-    correctly.
+    correctly. A pawn keeps no state of its own: the direction it moves in follows from its color, and
+    it can only still make its first move while it's on its starting row.
 
     Attributes:
         see base class."""
+    NAME = "Pawn"
+    PIECE_TYPE = PAWN
+    __slots__ = ()
 
     def __init__(self, color: Color) -> None:
         """Initializes this Pawn instance with the correct data.
 
         Params:
-            first_move (bool): A Boolean to represent if this is this pawns first move or not.
-            forward (int): To represent the direction this pawn will move.
             see base class."""
         super().__init__(color)
         self.set_image(525, color.value * 105)
-        self._first_move = True
-        if self.color == Color.WHITE:
-            self._forward = -1
-        else:
-            self._forward = 1
 
-    def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
+    def move_bits(self, y: int, x: int) -> int:
         """see base class."""
-        valid_moves = []
-        # adds moves two in front of this pawn
-        if self._first_move == True and Piece._game.get((self._forward * 2), x) is None:
-            valid_moves += self._vertical_moves(y, x, self._forward, 0, 2)
-        # add moves right in front of this pawn
-        # if Piece._game.get(self._forward, x) is None:
-        valid_moves += self._vertical_moves(y, x, self._forward, 0, 1)
-
-        real_valid_moves = []
-        for move in valid_moves:
-            y1, x2 = move
-            if Piece._game.get(y1, x2) is None:
-                real_valid_moves.append(move)
-
-        # diaganol left
-        if 0 <= y + self._forward < 8 and 0 <= (x + 1) < 8:
-            if Piece._game.get(y + self._forward, x + 1) is not None and Piece._game.get(y + self._forward,
-                                                                                         x + 1).color != self.color:
-                real_valid_moves += [((y + self._forward), (x + 1))]
-        # diaganol left
-        if 0 <= y + self._forward < 8 and 0 <= (x - 1) < 8:
-            if Piece._game.get(y + self._forward, x - 1) is not None and Piece._game.get(y + self._forward,
-                                                                                         x - 1).color != self.color:
-                real_valid_moves += [((y + self._forward), (x - 1))]
-        return real_valid_moves
-
-    def copy(self) -> 'Pawn':
-        """Returns a Pawn instance of the same color as the piece calling this method."""
-        r_pawn = Pawn(self.color)
-        r_pawn._first_move = self._first_move
-        r_pawn._forward = self._forward
-        return r_pawn
-
-
-"""For pawn class have another instance variable for direction for instance, 1 if the pawn is black
-since pawns can only move forward, and -1 if the pawn is white since pawns can only move forward and a
-white pawn will only move up and a black pawn will only move down.
-"""
+        occ = Piece._game._occ
+        return _pawn_bits(1 << (y * 8 + x), occ[0] | occ[1], occ[1 - self._color.value], self._color)
+
+
+# The piece class of each piece type, indexed by PIECE_TYPE.
+PIECE_CLASSES = (King, Queen, Bishop, Knight, Rook, Pawn)
+
+# A random 64-bit key for every piece type and color on every square, XORed together to hash a board. Indexed like
+# Game._bb, by color.value * 6 + piece type, and then by square.
+ZOBRIST = tuple(tuple(random.getrandbits(64) for _ in range(64)) for _ in range(12))
+
+# The bitboards of the starting position, indexed like Game._bb. WHITE starts on rows 6 and 7, BLACK on rows 0 and 1.
+START_BITBOARDS = (
+    1 << 60, 1 << 59, 1 << 58 | 1 << 61, 1 << 57 | 1 << 62, 1 << 56 | 1 << 63, 0xFF << 48,
+    1 << 4, 1 << 3, 1 << 2 | 1 << 5, 1 << 1 | 1 << 6, 1 << 0 | 1 << 7, 0xFF << 8,
+)
+# The color.value * 6 + piece type of the piece starting on each square, or None, indexed by y * 8 + x.
+START_POSITION = tuple(
+    next((index for index, bits in enumerate(START_BITBOARDS) if bits >> square & 1), None)
+    for square in range(64))
+# The occupancy bitboards and Zobrist hash of the starting position, so a reset doesn't rebuild them piece by piece.
+START_OCCUPANCY = (sum(START_BITBOARDS[:6]), sum(START_BITBOARDS[6:]))
+START_ZOBRIST = 0
+for _square, _start in enumerate(START_POSITION):
+    if _start is not None:
+        START_ZOBRIST ^= ZOBRIST[_start][_square]
+del _square, _start
 
 
 class Game:
@@ -608,73 +586,52 @@ class Game:
     This class holds all the logic for the a chess game.
 
     Attributes:
-        _board (list): A list to represent the current board status.
+        _board (list[None | Piece]): A list to represent the current board status, the piece or None on
+            each of the 64 squares indexed by y * 8 + x.
         current_player (Color): A Color to represent which team color is the current player.
-        _prior_states (list[list[None | tuple[int, int]]): An array to hold all of the previous board states."""
+        _prior_states (list[tuple]): A stack of the undo record returned by make_move for each move made so far.
+        _zobrist (int): The Zobrist hash of the current board.
+        _bb (list[int]): Twelve bitboards, one per color and piece type indexed by color.value * 6 + PIECE_TYPE,
+            with bit y * 8 + x set when that piece is at (y, x).
+        _occ (list[int]): Two bitboards of every square taken by a WHITE or a BLACK piece, indexed by color.value.
+        _pieces (tuple[Piece, ...]): The one shared piece of each color and piece type, indexed like _bb."""
 
     def __init__(self) -> None:
         '''
         initializes game with correct pieces in position on chess board, length of previous boards list is empty
         '''
         Piece.set_game(self)
-        self._board = [[None for i in range(0, 8)] for i in range(0, 8)]
+        Piece.load_spritesheet()
+        # Pieces hold nothing but their color and image, so the game only ever needs one of each kind. Every square,
+        # promotion and undo record refers to these, and no piece has to be copied or made while playing.
+        self._pieces = tuple(PIECE_CLASSES[index % 6](Color(index // 6)) for index in range(12))
+        self._board = [None] * 64
         self.current_player = Color.WHITE
         # this will serve as the stack data structure.
-        self._prior_states: list[list[None | tuple[int, int]]] = []
+        self._prior_states: list[tuple] = []
+        self._zobrist = 0
+        self._bb = [0] * 12
+        self._occ = [0, 0]
         self.reset()
 
     def reset(self) -> None:
         """Resets the chess game to its default state."""
-        # self._board = [[None for i in range(0, 8)] for i in range(0, 8)]
-
+        self._prior_states = []
         # This will reset the board to the defaults by setting all the pieces
         # back where they start
-
-        # could also write line:
-        self._board = [[None for i in range(0, 8)] for i in range(0, 8)]
-        # and then call setup_pieces, deleting nested loop
-
         self._setup_pieces()
-        # for row in range(2, 6):
-        #     for col in range(8):
-        #         self._board[row][col] = None
-        self._prior_states = []
         self.current_player = Color.WHITE
 
     def _setup_pieces(self) -> None:
         '''
-        sets up all chess pieces on the board and initilizes top pieces to color
-        black and bottom pieces to color white initializes all other chess squares to None
+        sets up all chess pieces on the board from START_POSITION, black pieces along the top and white
+        pieces along the bottom, and copies in the starting bitboards and hash worked out at import
         '''
-        # Black pieces
-        self._board[0][0] = Rook(Color.BLACK)
-        self._board[0][1] = Knight(Color.BLACK)
-        self._board[0][2] = Bishop(Color.BLACK)
-        self._board[0][3] = Queen(Color.BLACK)
-        self._board[0][4] = King(Color.BLACK)
-        self._board[0][5] = Bishop(Color.BLACK)
-        self._board[0][6] = Knight(Color.BLACK)
-        self._board[0][7] = Rook(Color.BLACK)
-        for i in range(8):
-            self._board[1][i] = Pawn(Color.BLACK)
-
-        # This code would set the middle squares to None
-        # for row in range(2, 6):
-        #     for col in range(8):
-        #         self._board[row][col] = None
-
-        # White pieces
-        self._board[7][0] = Rook(Color.WHITE)
-        self._board[7][1] = Knight(Color.WHITE)
-        self._board[7][2] = Bishop(Color.WHITE)
-        self._board[7][3] = Queen(Color.WHITE)
-        self._board[7][4] = King(Color.WHITE)
-        self._board[7][5] = Bishop(Color.WHITE)
-        self._board[7][6] = Knight(Color.WHITE)
-        self._board[7][7] = Rook(Color.WHITE)
-
-        for i in range(8):
-            self._board[6][i] = Pawn(Color.WHITE)
+        pieces = self._pieces
+        self._board = [None if start is None else pieces[start] for start in START_POSITION]
+        self._bb = list(START_BITBOARDS)
+        self._occ = list(START_OCCUPANCY)
+        self._zobrist = START_ZOBRIST
 
     def get(self, y: int, x: int) -> Optional[Piece]:
         """Returns the element at the passed location.
@@ -690,17 +647,14 @@ class Game:
         if not (0 <= y < 8) or not (0 <= x < 8):
             pass
         else:
-            return self._board[y][x]
+            return self._board[y * 8 + x]
 
     def switch_player(self) -> None:
         """
         Method that switches the current player to the opposing player.
         """
-
-        if self.current_player == Color.WHITE:
-            self.current_player = Color.BLACK
-        else:
-            self.current_player = Color.WHITE
+        # An index into OPPONENT rather than comparing colors, and current_player stays a Color.
+        self.current_player = OPPONENT[self.current_player]
 
     def undo(self) -> bool:
         '''
@@ -708,7 +662,7 @@ class Game:
 
         checks if the length of list of prior board states is not equal to zero
             if length of prior_states is 0, returns False meaning the undo method failed.
-            if length is not zero, sets board to value of previous board and switches the player color, and
+            if length is not zero, takes back the most recent move and switches the player color, and
             returns True meaning the undo method was successfully executed.
 
         :returns: a boolean representing if undoing the most recent move is possible
@@ -720,24 +674,63 @@ class Game:
         #     self._board = self._prior_states.pop()
         #     return True
         # return False
-        if len(self._prior_states) != 0:
-            self._board = self._prior_states.pop()
+        if self._prior_states:
+            self.unmake_move(self._prior_states.pop())
             self.switch_player()
             return True
         return False
 
-    def copy_board(self) -> list[list[None | Piece]]:
-        """Returns a copied version of the current board.
+    def _toggle_piece(self, piece: Piece, y: int, x: int) -> None:
+        """Adds the passed piece at the (y, x) location to the board's hash and bitboards, or removes it if it's
+        already there. This doesn't touch _board itself, the caller keeps both in step."""
+        square = y * 8 + x
+        index = piece.color * 6 + piece.PIECE_TYPE
+        self._zobrist ^= ZOBRIST[index][square]
+        self._bb[index] ^= 1 << square
+        self._occ[piece.color] ^= 1 << square
+
+    def make_move(self, y: int, x: int, y2: int, x2: int) -> tuple:
+        """Moves the piece at (y, x) to (y2, x2) in place, without checking the move is valid.
+
+        Whatever was on (y2, x2) is captured, and a pawn reaching the far row is promoted to a queen. The board's
+        hash and bitboards are kept in step. Nothing is copied, so a move can be tried and taken back cheaply.
+
+        Params:
+            y (int): An integer representing the row number of the piece to move.
+            x (int): An integer representing the column number of the piece to move.
+            y2 (int): An integer representing the row number to move the piece to.
+            x2 (int): An integer representing the column number to move the piece to.
 
         Returns:
-            _prior_board (list[list[None | Piece]]): A list of lists containing
-                None or a Piece subclass to represent a copied version of the current board"""
-        _prior_board = [[None for i in range(0, 8)] for i in range(0, 8)]
-        for i in range(0, 8):
-            for j in range(0, 8):
-                if self._board[i][j] is not None:
-                    _prior_board[i][j] = self._board[i][j].copy()
-        return _prior_board
+            undo (tuple): The record unmake_move needs to take this move back."""
+        board = self._board
+        piece = board[y * 8 + x]
+        captured = board[y2 * 8 + x2]
+        placed = piece
+        if piece.PIECE_TYPE == PAWN and y2 == PROMOTION_ROW[piece.color]:
+            placed = self._pieces[piece.color * 6 + QUEEN]
+        board[y2 * 8 + x2] = placed
+        board[y * 8 + x] = None
+        self._toggle_piece(piece, y, x)
+        self._toggle_piece(placed, y2, x2)
+        if captured is not None:
+            self._toggle_piece(captured, y2, x2)
+        return y, x, y2, x2, piece, captured, placed
+
+    def unmake_move(self, undo: tuple) -> None:
+        """Takes back the move make_move returned the passed undo record for.
+
+        Moves have to be taken back in the reverse order they were made.
+
+        Params:
+            undo (tuple): The record make_move returned."""
+        y, x, y2, x2, piece, captured, placed = undo
+        self._toggle_piece(placed, y2, x2)
+        self._toggle_piece(piece, y, x)
+        if captured is not None:
+            self._toggle_piece(captured, y2, x2)
+        self._board[y * 8 + x] = piece
+        self._board[y2 * 8 + x2] = captured
 
     def move(self, piece: Piece, y: int, x: int, y2: int, x2: int) -> bool:
         """Performs the move for the piece from the current location to the passed location
@@ -753,8 +746,6 @@ class Game:
             A boolean representing if a successful move occurred. True if a move successfully took place, false
             if not.
             """
-        self._prior_states.append(self.copy_board())
-
         # if self.check(piece.color):
         #     check_valid_moves = []
         #     for move in piece.valid_moves(y, x):
@@ -765,477 +756,241 @@ class Game:
         #         self.undo()
         #     piece.valid_moves = check_valid_moves
 
-        # if isinstance(piece, Pawn) and piece._first_move == True:
-        #     if (y2, x2) in piece.valid_moves(y, x):
-        #         self._board[y2][x2] = piece
-        #         self._board[y][x] = None
-        #         if self.check(piece.color):
-        #             self._board = self._prior_states.pop()
-        #             return False
-        #     piece._first_move = False
-
-        if (y2, x2) in piece.valid_moves(y, x):
-            self._board[y2][x2] = piece
-            self._board[y][x] = None
-            if self.check(piece.color):
-                self._board = self._prior_states.pop()
-                return False
-            if isinstance(piece, Pawn) and piece._first_move is True:
-                piece._first_move = False
-
-        if isinstance(piece, Pawn) and piece.color == Color.WHITE and y2 == 0:
-            self._board[y2][x2] = Queen(piece.color)
-        elif isinstance(piece, Pawn) and piece.color == Color.BLACK and y2 == 7:
-            self._board[y2][x2] = Queen(piece.color)
-
+        # A target off the board would be packed as a square further along it, so it's turned down first.
+        if not (0 <= y2 < 8 and 0 <= x2 < 8):
+            return False
+        # One shift and mask against the piece's move bitboard rather than searching a list of its moves.
+        if not piece.move_bits(y, x) >> (y2 * 8 + x2) & 1:
+            return False
+        undo = self.make_move(y, x, y2, x2)
+        # A move that leaves the mover's own king in check is taken straight back.
+        if self.check(piece.color):
+            self.unmake_move(undo)
+            return False
+        self._prior_states.append(undo)
         self.switch_player()
         return True
 
+    def generate_all_moves(self, color: Color) -> list[int]:
+        """Returns every move the pieces of the passed color can make, whether or not it leaves their king in check.
+
+        The pieces are found straight from the color's bitboards, piece type by piece type, and each move is
+        packed into one int as from_square << 6 | to_square, with both squares packed as y * 8 + x.
+
+        Params:
+            color (Color): The color to generate the moves of.
+
+        Returns:
+            moves (list[int]): The packed moves."""
+        board = self._board
+        moves = []
+        for pieces in self._bb[color * 6:color * 6 + 6]:
+            while pieces:
+                lowest = pieces & -pieces
+                square = lowest.bit_length() - 1
+                bits = board[square].move_bits(square >> 3, square & 7)
+                while bits:
+                    target = bits & -bits
+                    moves.append(square << 6 | (target.bit_length() - 1))
+                    bits ^= target
+                pieces ^= lowest
+        return moves
+
     def get_piece_locations(self, color: Color) -> list[tuple[int, int]]:
         """Returns a list[tuple[int, int]] representing all the locations of each piece of the passed color."""
-        all_piece_locations = []
-        for y in range(0, 8):
-            for x in range(0, 8):
-                if self._board[y][x] is not None and self._board[y][x].color == color:
-                    all_piece_locations.append((y, x))
-        return all_piece_locations
+        # Walk the set bits of this color's occupancy from the lowest square up, the same order as a row by row scan.
+        return _bits_to_moves(self._occ[color.value])
 
     def find_king(self, color: Color) -> tuple[int, int]:
         """Returns a tuple of two integers representing the location of the king of the passed color."""
-        for y in range(0, 8):
-            for x in range(0, 8):
-                if self._board[y][x] is not None and isinstance(self._board[y][x], King) and self._board[y][
-                    x].color == color:
-                    return (y, x)
+        king = self._bb[color.value * 6 + KING]
+        if king:
+            return divmod(king.bit_length() - 1, 8)
 
+    @_memoize_status
     def check(self, color: Color) -> bool:
         """Returns a boolean representing if the king of the passed color is in check or not."""
-        if color == Color.WHITE:
-            opponent_color = Color.BLACK
-        else:
-            opponent_color = Color.WHITE
-        opponent_piece_locations = self.get_piece_locations(opponent_color)
-        ky, kx = self.find_king(color)
-
-        for piece in opponent_piece_locations:
-            all_valid_moves = []
-            y, x = piece
-            all_valid_moves += self._board[y][x].valid_moves(y, x)
-            if (ky, kx) in all_valid_moves:
-                return True
-        return False
+        king = self._bb[color * 6 + KING]
+        if not king:
+            return False
+        return _square_attacked(self._bb, self._occ[0] | self._occ[1], king.bit_length() - 1, color)
+
+    def _leaves_king_safe(self, color: Color, move: int) -> bool:
+        """Returns if making the passed move would leave the king of the passed color out of check.
+
+        The move isn't made. The few bitboards it changes are worked out on a copy instead, so none of the board,
+        its hash, or the status cache is touched. A promotion doesn't matter here, the square is taken either way.
+
+        Params:
+            color (Color): The color making the move.
+            move (int): The move, packed as from_square << 6 | to_square like generate_all_moves.
+
+        Returns:
+            A boolean, True if the king isn't attacked once the move is made."""
+        start = move >> 6
+        end = move & 63
+        piece_type = self._board[start].PIECE_TYPE
+        captured = self._board[end]
+        bb = self._bb[:]
+        bb[color * 6 + piece_type] ^= (1 << start) | (1 << end)
+        if captured is not None:
+            bb[captured.color * 6 + captured.PIECE_TYPE] ^= 1 << end
+        king = bb[color * 6 + KING]
+        if not king:
+            return True
+        occupied = ((self._occ[0] | self._occ[1]) ^ (1 << start)) | (1 << end)
+        return not _square_attacked(bb, occupied, king.bit_length() - 1, color)
 
+    @_memoize_status
     def mate(self, color: Color) -> bool:
         """Returns a boolean representing if this piece is in checkmate.
 
         Params:
             color (Color): A Color instance variable representing the color of the chess piece
                 we will be checking to see if is in checkmate."""
-        # checks if this color is in check
-        if self.check(color):
-            # if this color is in check we then check for if it's in checkmate
-
-            # if the color we're checking for is white then the opponent is black color
-            if color == Color.WHITE:
-                opponent_color = Color.BLACK
-            else:
-                # if the color we're checking for is black then the opponent color is white
-                opponent_color = Color.WHITE
-            # get all the locations of the opponents pieces
-            opponent_piece_locations = self.get_piece_locations(opponent_color)
-
-            all_opponent_valid_moves = []
-            # get the location of the king of the passed color
-            ky, kx = self.find_king(color)
-            # loop over all of the opponents pieces
-            for piece in opponent_piece_locations:
-                # assign y and x to the location of the piece.
-                y, x = piece
-                # add all of the possible moves that this piece can do and add them to the valid_moves list.
-                all_opponent_valid_moves += self._board[y][x].valid_moves(y, x)
-            # get all of the kings valid moves.
-            king_valid_moves = self._board[ky][kx].valid_moves(ky, kx)
-            # Check all the moves for the king piece
-            for move in king_valid_moves:
-                # checks if this move that the king can do is not in the opponents valid moves
-                if move not in all_opponent_valid_moves:
-                    king_success_move = self.move(self._board[ky][kx], ky, kx, move[0], move[1])
-                    if king_success_move is True:
-                        self.undo()
-                        # if a king can make a move that isn't in the opponents moves, then he isn't in check.
-                        # so return False
-                        return False
-
-            # Get all the moves that this player could make
-            for y in range(0, 8):
-                for x in range(0, 8):
-                    # assign all_valid_moves to an empty list for each x shift.
-                    all_valid_moves = []
-                    # makes sure that the element at this spot is not None and that it's the same color as the passed color.
-                    if self._board[y][x] is not None and self._board[y][x].color == color:
-                        # if there is a piece of the passed color. assign current_piece to that location.
-                        current_piece = self._board[y][x]
-                        # all_valid_moves is equal to the list of the valid moves for this piece.
-                        all_valid_moves += current_piece.valid_moves(y, x)
-                        # loop through each valid move for this piece
-                        for movee in all_valid_moves:
-                            ny, nx = movee
-                            success_or_fail = self.move(current_piece, y, x, ny, nx)
-                            # If the move was a success, then True was returned, so that means the king won't be in
-                            # check.
-                            if success_or_fail == True:
-                                # The move was a success so the move actually took place so we need to undo that
-                                # move so the actual game board doesn't get changed
-                                self._board = self._prior_states.pop()
-                                return False
+        # king was never in check so it can't be in checkmate.
+        if not self.check(color):
+            return False
+        # Try every move this player could make, king moves included. If any of them gets the king out of check
+        # this isn't checkmate.
+        for move in self.generate_all_moves(color):
+            if self._leaves_king_safe(color, move):
+                return False
+        return True
 
-            return True
-        # king was never in check so we return false.
-        return False
+    def _material(self, color: Color) -> int:
+        """Returns the worth in PIECE_VALUES of the pieces of the passed color, less the worth of its opponent's."""
+        bb = self._bb
+        own = color * 6
+        opponent = OPPONENT[color] * 6
+        score = 0
+        for piece_type in range(QUEEN, PAWN + 1):
+            # Counting the set bits of a bitboard counts that kind of piece.
+            count = bb[own + piece_type].bit_count() - bb[opponent + piece_type].bit_count()
+            score += PIECE_VALUES[piece_type] * count
+        return score
+
+    def _ordered_moves(self, color: Color, first: Optional[int]) -> list[int]:
+        """Returns the moves of the passed color in the order the AI's search tries them.
+
+        The passed move goes first, then the captures, the most valuable piece captured by the least valuable piece
+        first, then everything else. Moves that tie are left in a random order so the AI doesn't always play the
+        same game.
 
-    def ai_checkmate(self) -> tuple[tuple[int, int] | None, tuple[int, int] | None, bool]:
-        """This method does the check move for the AI.
-
-                Returns:
-                    A tuple of None, None, and False or a tuple that contains another tuple
-                    with the location of the piece that will do the move to put the
-                    white team in checkmate, and the next element in the tuple is the
-                    location of the move that will be done to put white team in checkmate,
-                    and the last element of the tuple is a boolean representing the fact
-                    that the black team found a way to put white team in checkmate."""
-        all_locations = self.get_piece_locations(Color.BLACK)
-        for loc in all_locations:
-            y, x = loc
-            moves = self._board[y][x].valid_moves(y, x)
-            for move in moves:
-                y2, x2 = move
-                # gets if the move was a success or not
-                move_success_or_fail = self.move(self._board[y][x], y, x, y2, x2)
-                # if the move worked then we see if it caused the white player to be put into checkmate
-                if move_success_or_fail:
-                    mate_success_or_fail = self.mate(Color.WHITE)
-                    # If the white player was put in checkmate we want to return the location of the piece,
-                    # and the move it made, and a success boolean.
-                    if mate_success_or_fail:
-                        self.undo()
-                        return (y, x), (y2, x2), True
-                    # If the move didn't checkmate the white player, then we need to undo the move
-                    # so it doesn't get done.
-                    else:
-                        self.undo()
-        return None, None, False
-
-    def ai_check(self) -> tuple[tuple[int, int] | None, tuple[int, int] | None, bool]:
-        """This method does the check move for the AI.
-
-                Returns:
-                    A tuple of None, None, and False or a tuple that contains another tuple
-                    with the location of the piece that will do the move to put the
-                    white team in checkmate, and the next element in the tuple is the
-                    location of the move that will be done to put white team in checkmate,
-                    and the last element of the tuple is a boolean representing the fact
-                    that the black team found a way to put white team in checkmate."""
-        # We get all of the black pieces
-        all_black_pieces = self.get_piece_locations(Color.BLACK)
-        # we loop over all of the black pieces.
-        for piece in all_black_pieces:
-            # assign the current piece's location to py, px
-            py, px = piece
-            # gets all of the valid moves for this piece
-            this_pieces_valid_moves = self._board[py][px].valid_moves(py, px)
-            # loops over all of the moves for this piece to try each one and see if it causes black to check the white team.
-            for move in this_pieces_valid_moves:
-                # assigns the move to be tested and its coordinates to y2 and x2.
-                y2, x2 = move
-                # tries the move and see if it resulted in a success or failure (if the move was executed or not).
-                move_success_or_fail = self.move(self.get(py, px), py, px, y2, x2)
-                # if the move was a success and was moved:
-                if move_success_or_fail:
-                    # see if the move just done caused black to put white in check.
-                    check_succ_or_fail = self.check(Color.WHITE)
-                    # if the move put white in check, return the correct values.
-                    if check_succ_or_fail:
-                        # undo the move first because the move hasn't been executed in the computer move method.
-                        self.undo()
-                        # return the piece that will do the move, and the move it will do and a boolean of True meaning
-                        # black can do a move to put white in check.
-                        return piece, move, True
-                    # if the move didn't put white in check, we still have to undo the move since it's not a move we
-                    # want to execute since white wasn't put in check.
-                    else:
-                        self.undo()
-        # If none of the possible moves we could do could put white in check, we return None, None, False.
-        return None, None, False
-
-    # type hint needed for return values
-    def ai_capture_queen(self) -> tuple[tuple[int, int] | None, tuple[int, int] | None, bool]:
-        '''Allows the AI to capture the queen if that's a valid outcome for the AI.
-
-        returns: - tuple representing location of enemy queen
-                 - tuple representing move used to capture queen
-                 - boolean representing if the move can be made by black team
+        Params:
+            color (Color): The color to order the moves of.
+            first (Optional[int]): The packed move to try before any other, or None.
 
-        '''
-        queen_locations = []
-        for y in range(0, 8):
-            for x in range(0, 8):
-                if isinstance(self._board[y][x], Queen) and self._board[y][x].color == Color.WHITE:
-                    queen_locations.append((y, x))
-        all_locations = self.get_piece_locations(Color.BLACK)
-        for loc in all_locations:
-            y, x = loc
-            moves = self._board[y][x].valid_moves(y, x)
-            for queen_loc in queen_locations:
-                if queen_loc in moves:
-                    move_success_or_not = self.move(self._board[y][x], y, x, queen_loc[0], queen_loc[1])
-                    if move_success_or_not:
-                        self.undo()
-                        # I think we can just return the queen_loc
-                        return (y, x), moves[moves.index(queen_loc)], True
-        return None, None, False
-
-    def ai_capture_bishop(self) -> tuple[tuple[int, int] | None, tuple[int, int] | None, bool]:
-        '''Allows the AI to capture the bishop if that's a valid possibility for the AI.
-
-        returns: - tuple representing location of enemy bishop
-                 - tuple representing move used to capture bishop
-                 - boolean representing if the move can be made by black team
+        Returns:
+            moves (list[int]): The packed moves, like generate_all_moves."""
+        board = self._board
+        moves = self.generate_all_moves(color)
+        random.shuffle(moves)
+
+        def order(move: int) -> int:
+            if move == first:
+                return MATE_SCORE
+            captured = board[move & 63]
+            if captured is None:
+                return 0
+            return 8 * PIECE_VALUES[captured.PIECE_TYPE] - PIECE_VALUES[board[move >> 6].PIECE_TYPE] + 1
+        moves.sort(key=order, reverse=True)
+        return moves
 
-        '''
-        bishop_locations = []
-        for y in range(0, 8):
-            for x in range(0, 8):
-                if isinstance(self._board[y][x], Bishop) and self._board[y][x].color == Color.WHITE:
-                    bishop_locations.append((y, x))
-        all_locations = self.get_piece_locations(Color.BLACK)
-        for loc in all_locations:
-            y, x = loc
-            moves = self._board[y][x].valid_moves(y, x)
-            for bishop_loc in bishop_locations:
-                if bishop_loc in moves:
-                    move_success_or_not = self.move(self._board[y][x], y, x, bishop_loc[0], bishop_loc[1])
-                    if move_success_or_not:
-                        self.undo()
-                        # I think we can just return the queen_loc
-                        return (y, x), moves[moves.index(bishop_loc)], True
-        return None, None, False
-
-    def ai_capture_knight(self) -> tuple[tuple[int, int] | None, tuple[int, int] | None, bool]:
-        '''Allows the AI to capture a knight if that's a valid possibility for it.
-
-        returns: - tuple representing location of enemy knight
-                 - tuple representing move used to capture knight
-                 - boolean representing if the move can be made by black team
+    def _negamax(self, color: Color, depth: int, alpha: int, beta: int, table: dict) -> int:
+        """Returns the score of the board for the passed color to move, searching depth moves ahead.
 
-        '''
-        knight_locations = []
-        for y in range(0, 8):
-            for x in range(0, 8):
-                if isinstance(self._board[y][x], Knight) and self._board[y][x].color == Color.WHITE:
-                    knight_locations.append((y, x))
-        all_locations = self.get_piece_locations(Color.BLACK)
-        for loc in all_locations:
-            y, x = loc
-            moves = self._board[y][x].valid_moves(y, x)
-            for knight_loc in knight_locations:
-                if knight_loc in moves:
-                    move_success_or_not = self.move(self._board[y][x], y, x, knight_loc[0], knight_loc[1])
-                    if move_success_or_not:
-                        self.undo()
-                        # I think we can just return the queen_loc
-                        return (y, x), moves[moves.index(knight_loc)], True
-        return None, None, False
-
-    def ai_capture_rook(self) -> tuple[tuple[int, int] | None, tuple[int, int] | None, bool]:
-        '''Allows the AI to capture a rook if that's a valid outcome for the AI.
-
-        returns: - tuple representing location of enemy rook
-                 - tuple representing move used to capture rook
-                 - boolean representing if the move can be made by black team
+        Both colors are assumed to play their best, and the score is from the point of view of whoever is moving,
+        so one color's score is minus the other's. Alpha-beta pruning stops trying a color's moves as soon as one
+        is good enough that the other color wouldn't have allowed it. The score and best move found for each board
+        are kept in table under the board's Zobrist hash, so a board reached again is a lookup, and the best move
+        from a shallower search is tried first by the next.
 
-        '''
-        rook_locations = []
-        for y in range(0, 8):
-            for x in range(0, 8):
-                if isinstance(self._board[y][x], Rook) and self._board[y][x].color == Color.WHITE:
-                    rook_locations.append((y, x))
-        all_locations = self.get_piece_locations(Color.BLACK)
-        for loc in all_locations:
-            y, x = loc
-            moves = self._board[y][x].valid_moves(y, x)
-            for rook_loc in rook_locations:
-                if rook_loc in moves:
-                    move_success_or_not = self.move(self._board[y][x], y, x, rook_loc[0], rook_loc[1])
-                    if move_success_or_not:
-                        self.undo()
-                        # I think we can just return the queen_loc
-                        return (y, x), moves[moves.index(rook_loc)], True
-        return None, None, False
-
-    def ai_capture_pawn(self) -> tuple[tuple[int, int] | None, tuple[int, int] | None, bool]:
-        '''Allows the AI to capture a pawn if that's a valid move available to the AI.
-
-        returns: - tuple representing location of enemy pawn
-                 - tuple representing move used to capture pawn
-                 - boolean representing if the move can be made by black team
+        Params:
+            color (Color): The color to move.
+            depth (int): How many more moves to search.
+            alpha (int): The score the color to move already has guaranteed elsewhere.
+            beta (int): The score the opponent already has guaranteed elsewhere, so anything above it is cut off.
+            table (dict[tuple[int, Color], tuple[int, int, int, int]]): The (depth, EXACT/LOWER_BOUND/UPPER_BOUND,
+                score, best move) kept for each (board hash, color to move) so far.
 
-        '''
-        pawn_locations = []
-        for y in range(0, 8):
-            for x in range(0, 8):
-                if isinstance(self._board[y][x], Pawn) and self._board[y][x].color == Color.WHITE:
-                    pawn_locations.append((y, x))
-        all_locations = self.get_piece_locations(Color.BLACK)
-        for loc in all_locations:
-            y, x = loc
-            moves = self._board[y][x].valid_moves(y, x)
-            for pawn_loc in pawn_locations:
-                if pawn_loc in moves:
-                    move_success_or_not = self.move(self._board[y][x], y, x, pawn_loc[0], pawn_loc[1])
-                    if move_success_or_not:
-                        self.undo()
-                        # I think we can just return the queen_loc
-                        return (y, x), moves[moves.index(pawn_loc)], True
-        return None, None, False
-
-    def _computer_move(self) -> str:
-        """Performs the move for the AI."""
-
-        # we need to loop until the computer makes a valid move because if they make an invalid move then nothing
-        # happened for the turn, could this cause the game to be unplayable? Since we're waiting for the black
-        # color to make a move but they never did since it wasn't in a loop.
-
-        # gets the piece location, the checkmate move location, and there was a succesful checkmate move found.
-        # piece_loc, mate_move, success_or_fail = self.ai_mate()
-        # py, px = piece_loc
-        # my, mx = mate_move
-        # if success_or_fail:
-        #     self.move(self._board[py][px], py, px, my, mx)
-        #     return
-        # # this does the check movement
-        # piece_loc, check_move, success_or_fail = self.ai_check()
-        # py, px = piece_loc
-        # cy, cx = check_move
-        # elif success_or_fail:
-        #     self.move(self._board[py][px], py, px, cy, cx)
-        #     return
-        # gets the result for the checkmate move
-        piece_for_checkmate, move_for_checkmate_loc, checkmate_success_or_fail = self.ai_checkmate()
-        # gets the result for the check move
-        piece_for_check_loc, move_for_check_loc, check_success_or_fail = self.ai_check()
-        # gets the result for the queen capture.
-        queen_piece_loc, queen_capture, queen_success_or_fail = self.ai_capture_queen()
-        # gets the result for the bishop capture.
-        bishop_piece_loc, bishop_capture, bishop_success_or_fail = self.ai_capture_bishop()
-        # gets the result for the knight capture
-        knight_piece_loc, knight_capture, knight_success_or_fail = self.ai_capture_knight()
-        # gets the result for the rook capture.
-        rook_piece_loc, rook_capture, rook_success_or_fail = self.ai_capture_rook()
-        # gets the result for the pawn capture
-        pawn_piece_loc, pawn_capture, pawn_success_or_fail = self.ai_capture_pawn()
-        if piece_for_checkmate is not None:
-            py, px = piece_for_checkmate
-            my, mx = move_for_checkmate_loc
-            if checkmate_success_or_fail:
-                eaten_piece = self.get(my, mx)
-                self.move(self.get(py, px), py, px, my, mx)
-                return
-        elif piece_for_check_loc is not None:
-            py, px = piece_for_check_loc
-            ky, kx = move_for_check_loc
-            if check_success_or_fail:
-                eaten_piece = self.get(ky, kx)
-                self.move(self._board[py][px], py, px, ky, kx)
-                # return f"BLACK moved {type(self.get(qy, qx)).__name__} and captures " + f"{type(eaten_piece).__name__}\n"
-                return
-        # this does capture queen move
-        elif queen_piece_loc is not None:
-            py, px = queen_piece_loc
-            qy, qx = queen_capture
-            if queen_success_or_fail:
-                eaten_piece = self.get(py, px)
-                self.move(self._board[py][px], py, px, qy, qx)
-                return f"BLACK moved {type(self.get(qy, qx)).__name__} and captures " + f"{type(eaten_piece).__name__}\n"
-        # this does capture bishop move
-        elif bishop_piece_loc is not None:
-            py, px = bishop_piece_loc
-            by, bx = bishop_capture
-            if bishop_success_or_fail:
-                eaten_piece = self.get(by, bx)
-                self.move(self._board[py][px], py, px, by, bx)
-                return f"BLACK moved {type(self.get(by, bx)).__name__} and captures " + f"{type(eaten_piece).__name__}\n"
-        # this does capture knight move
-        elif knight_piece_loc is not None:
-            py, px = knight_piece_loc
-            ky, kx = knight_capture
-            if knight_success_or_fail:
-                eaten_piece = self.get(ky, kx)
-                self.move(self._board[py][px], py, px, ky, kx)
-                return f"BLACK moved {type(self.get(ky, kx)).__name__} and captures " + f"{type(eaten_piece).__name__}\n"
-        # this does capture rook move
-        elif rook_piece_loc is not None:
-            py, px = rook_piece_loc
-            ry, rx = rook_capture
-            if rook_success_or_fail:
-                eaten_piece = self.get(ry, rx)
-                self.move(self._board[py][px], py, px, ry, rx)
-                return f"BLACK moved {type(self.get(ry, rx)).__name__} and captures " + f"{type(eaten_piece).__name__}\n"
-        # this does capture pawn move
-        elif pawn_piece_loc is not None:
-            py, px = pawn_piece_loc
-            pay, pax = pawn_capture
-            if pawn_success_or_fail:
-                eaten_piece = self.get(pay, pax)
-                self.move(self._board[py][px], py, px, pay, pax)
-                return f"BLACK moved {type(self.get(pay, pax)).__name__} and captures " + f"{type(eaten_piece).__name__}\n"
-        # #
-        # #
-        # #
-        # #
+        Returns:
+            score (int): The material the color to move is up by in PIECE_VALUES, or below -MATE_SCORE if it gets
+            checkmated and above MATE_SCORE if it checkmates, further out the sooner it happens."""
+        if depth == 0:
+            return self._material(color)
+        key = (self._zobrist, color)
+        entry = table.get(key)
+        first = None
+        if entry is not None:
+            entry_depth, bound, score, first = entry
+            if entry_depth >= depth and (bound == EXACT or bound == LOWER_BOUND and score >= beta
+                                         or bound == UPPER_BOUND and score <= alpha):
+                return score
+        original_alpha = alpha
+        best_score = best_move = None
+        opponent = OPPONENT[color]
+        for move in self._ordered_moves(color, first):
+            if not self._leaves_king_safe(color, move):
+                continue
+            undo = self.make_move(move >> 9, (move >> 6) & 7, (move >> 3) & 7, move & 7)
+            score = -self._negamax(opponent, depth - 1, -beta, -alpha, table)
+            self.unmake_move(undo)
+            if best_move is None or score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        if best_move is None:
+            # No moves left: checkmate, worse the sooner it comes, or stalemate, which is even.
+            return -MATE_SCORE - depth if self.check(color) else 0
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
         else:
-            # generate a random move
-            # sets success_or_fail to false so the while loop will run.
-            success_or_fail = False
-            # get all of the locations of the ai pieces.
-            ai_piece_locations = self.get_piece_locations(Color.BLACK)
-            # since success_or_fail is set to false the while loop is ran
-            while not success_or_fail:
-                # set the ai's valid moves to the empty list.
-                all_ai_valid_moves: list[tuple[int, int]] = []
-                # gets the index that will be used to pick which of the ai's pieces will be moved. This is picked by
-                # getting a random index from 0 to the number of the total pieces on the board.
-                index_for_piece_to_be_randomly_moved = random.randint(0, len(ai_piece_locations) - 1)
-                # gets the actual location of the randomly picked piece to be moved.
-                piece_to_be_moved_location = ai_piece_locations[index_for_piece_to_be_randomly_moved]
-                # assigns y, and x from the location of the actual piece to be moved.
-                y, x = piece_to_be_moved_location
-                # Allows us to refer to the piece that has been raandomly picked by variable name actual_piece_to_be_
-                # moved
-                actual_piece_to_be_moved = self.get(y, x)
-                # gets all the valid moves for this piece
-                all_ai_valid_moves += actual_piece_to_be_moved.valid_moves(y, x)
-                # if this piece has no valid moves, we will pick a random piece again. So, we will keep picking a random
-                # piece until we find one that has valid moves that can be made.
-                if len(all_ai_valid_moves) == 0:
-                    ai_piece_locations.remove((y, x))
-                    continue
-                # Gets the index that will be used to pick a random move from 0 to the number of moves this piece can
-                # make.
-                index_for_random_move = random.randint(0, len(all_ai_valid_moves) - 1)
-                # assigns the actual move that has been randomly picked to actual_random_move variable.
-                actual_random_move = all_ai_valid_moves[index_for_random_move]
-                # y2, x2 is the y and x location of the actual random move to be made.
-                y2, x2 = actual_random_move
-                # If the move was a success, then the success_or_fail variable is changed to True and the loop is exited.
-                # if the move was a failure, then the move method should've undone the move that was executed
-                # and success_or_fail is still false, so the loop will happen again until a move was a success meaning
-                # the success_or_fail variable was changed to True.
-                target = self.get(y2, x2)
-                success_or_fail = self.move(actual_piece_to_be_moved, y, x, y2, x2)
-            if target:
-                return f"BLACK moved {type(self.get(y2, x2)).__name__} and captures " + f"{type(target).__name__}\n"
-            else:
-                return f"BLACK moved {type(self.get(y2, x2)).__name__}\n"
+            bound = EXACT
+        table[key] = (depth, bound, best_score, best_move)
+        return best_score
+
+    def ai_search(self) -> tuple[tuple[int, int] | None, tuple[int, int] | None, bool]:
+        '''Finds the AI's best move by searching SEARCH_DEPTH moves ahead with _negamax.
+
+        The board is searched one move deep, then two, and so on (iterative deepening). Each search leaves the best
+        move of every board it saw in the table and the next one tries those first, so alpha-beta can cut off
+        most of the other moves straight away, which makes the deeper search cheaper than going straight to it.
+
+        returns: - tuple representing location of the black piece to move
+                 - tuple representing the move the piece makes
+                 - boolean representing if the black team has a move to make at all
+
+        '''
+        table: dict[tuple[int, Color], tuple[int, int, int, int]] = {}
+        for depth in range(1, SEARCH_DEPTH + 1):
+            self._negamax(Color.BLACK, depth, -2 * MATE_SCORE, 2 * MATE_SCORE, table)
+        entry = table.get((self._zobrist, Color.BLACK))
+        if entry is None:
+            return None, None, False
+        move = entry[3]
+        return divmod(move >> 6, 8), divmod(move & 63, 8), True
+
+    def _computer_move(self) -> Optional[str]:
+        """Performs the move for the AI.
+
+        Returns:
+            The report of the move made, or None if the black team has no move to make."""
+        # Checkmates, checks and captures all fall out of the search, which weighs each one against what WHITE can
+        # do in reply rather than taking the first one found.
+        piece_loc, move_loc, success_or_fail = self.ai_search()
+        if not success_or_fail:
+            # the search tried every move black has, so with none found there's nothing to make or report.
+            return None
+        py, px = piece_loc
+        my, mx = move_loc
+        eaten_piece = self.get(my, mx)
+        self.move(self._board[py * 8 + px], py, px, my, mx)
+        return self.get(my, mx).move_text(eaten_piece) + "\n"
 
     def no_moves_left(self, color: Color) -> bool:
         """Returns a boolean representing if this color has no more possible moves left.
@@ -1250,17 +1005,12 @@ class Game:
         # result in a tie since check/checkmate occurred.
         if self.check(color):
             return False
-        # this color isn't in check, so let's check if there's a valid move they can make.
-        all_pieces = self.get_piece_locations(color)
-        move_count = 0
-        for piece in all_pieces:
-            all_moves = piece.valid_moves(piece[0], piece[1])
-            for move in all_moves:
-                move_succ_or_fail = self.move(self._board[piece[0]][piece[1]], piece[0], piece[1], move[0], move[1])
-                # if the move was successfully done, then undo the move so it isn't shown on the actual game board
-                # and return False because this means that there is a valid move that this team color can do.
-                if move_succ_or_fail:
-                    self.undo()
-                    return False
+        # this color isn't in check, so let's check if there's a valid move they can make. Each move is only
+        # tested, never made, so nothing on the actual game board has to be undone.
+        for move in self.generate_all_moves(color):
+            # if the move doesn't leave the king in check, return False because this means that there is a valid
+            # move that this team color can do.
+            if self._leaves_king_safe(color, move):
+                return False
         return True
 